@@ -127,9 +127,9 @@ def evaluate_grasp_point(sim, pos, normal, num_rotations=6):
 
     # try to grasp with different yaw angles
     yaws = np.linspace(0.0, np.pi, num_rotations)
+    oris = R * Rotation.from_euler("z", yaws[:, np.newaxis])
     outcomes, widths = [], []
-    for yaw in yaws:
-        ori = R * Rotation.from_euler("z", yaw)
+    for ori in oris:
         sim.restore_state()
         candidate = Grasp(Transform(ori, pos), width=sim.gripper.max_opening_width)
         outcome, width = sim.execute_grasp(candidate, remove=False)
@@ -144,7 +144,7 @@ def evaluate_grasp_point(sim, pos, normal, num_rotations=6):
             x=np.r_[0, successes, 0], height=1, width=1
         )
         idx_of_widest_peak = peaks[np.argmax(properties["widths"])] - 1
-        ori = R * Rotation.from_euler("z", yaws[idx_of_widest_peak])
+        ori = oris[idx_of_widest_peak]
         width = widths[idx_of_widest_peak]
 
     return Grasp(Transform(ori, pos), width), int(np.max(outcomes))
@@ -86,7 +86,7 @@ class GraspDetectionServer(object):
         vis.draw_quality(qual_vol, voxel_size, threshold=0.01)
 
         tic = time.time()
-        grasps, scores = select(qual_vol, rot_vol, width_vol, 0.90, 1)
+        grasps, scores = select(qual_vol, rot_vol, width_vol, 0.90, 1, self.device)
         num_grasps = len(grasps)
         if num_grasps > 0:
             idx = np.random.choice(num_grasps, size=min(5, num_grasps), replace=False)
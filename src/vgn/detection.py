@@ -1,8 +1,10 @@
+import functools
 import time
 
 import numpy as np
 from scipy import ndimage
 import torch
+import torch.nn.functional as F
 
 from vgn import vis
 from vgn.grasp import *
@@ -23,7 +25,7 @@ class VGN(object):
         tic = time.time()
         qual_vol, rot_vol, width_vol = predict(tsdf_vol, self.net, self.device)
         qual_vol, rot_vol, width_vol = process(tsdf_vol, qual_vol, rot_vol, width_vol)
-        grasps, scores = select(qual_vol.copy(), rot_vol, width_vol)
+        grasps, scores = select(qual_vol, rot_vol, width_vol, device=self.device)
         toc = time.time() - tic
 
         grasps, scores = np.asarray(grasps), np.asarray(scores)
@@ -42,18 +44,42 @@ class VGN(object):
 def predict(tsdf_vol, net, device):
     assert tsdf_vol.shape == (1, 40, 40, 40)
 
-    # move input to the GPU
-    tsdf_vol = torch.from_numpy(tsdf_vol).unsqueeze(0).to(device)
+    qual_vols, rot_vols, width_vols = predict_batch(
+        np.expand_dims(tsdf_vol, 0), net, device
+    )
+    return qual_vols[0], rot_vols[0], width_vols[0]
+
+
+def predict_batch(tsdf_vols, net, device):
+    """Run a single forward pass over a batch of TSDFs of shape (N, 1, 40, 40, 40).
+
+    Returns the quality, rotation and width volumes, the rotation volume with shape
+    (N, 40, 40, 40, 4). With a network compiled by `load_network`, the first call
+    with a new batch size N triggers another compilation.
+    """
+    assert tsdf_vols.shape[1:] == (1, 40, 40, 40)
+
+    # move input to the GPU, staging it in page-locked memory for an async copy
+    tsdf_vols = torch.from_numpy(tsdf_vols)
+    if device.type == "cuda":
+        tsdf_vols = _pinned_buffer(tsdf_vols.shape).copy_(tsdf_vols)
+    tsdf_vols = tsdf_vols.to(device, non_blocking=True)
 
     # forward pass
-    with torch.no_grad():
-        qual_vol, rot_vol, width_vol = net(tsdf_vol)
+    with torch.inference_mode():
+        qual_vols, rot_vols, width_vols = net(tsdf_vols)
+        out = torch.cat((qual_vols, rot_vols, width_vols), dim=1)
 
-    # move output back to the CPU
-    qual_vol = qual_vol.cpu().squeeze().numpy()
-    rot_vol = rot_vol.cpu().squeeze().numpy()
-    width_vol = width_vol.cpu().squeeze().numpy()
-    return qual_vol, rot_vol, width_vol
+    # move output back to the CPU with a single transfer, with the channels as the
+    # innermost axis such that the quaternion of a voxel is contiguous in memory
+    out = out.permute(0, 2, 3, 4, 1).contiguous().cpu().numpy()
+    return out[..., 0], out[..., 1:5], out[..., 5]
+
+
+@functools.lru_cache(maxsize=1)
+def _pinned_buffer(shape):
+    # only keep the buffer of the last batch size, page-locked memory is scarce
+    return torch.empty(shape, pin_memory=True)
 
 
 def process(
@@ -78,37 +104,54 @@ def process(
     valid_voxels = ndimage.morphology.binary_dilation(
         outside_voxels, iterations=2, mask=np.logical_not(inside_voxels)
     )
-    qual_vol[valid_voxels == False] = 0.0
 
     # reject voxels with predicted widths that are too small or too large
-    qual_vol[np.logical_or(width_vol < min_width, width_vol > max_width)] = 0.0
+    valid_voxels &= np.logical_not(
+        np.logical_or(width_vol < min_width, width_vol > max_width)
+    )
 
-    return qual_vol, rot_vol, width_vol
+    # zero out all rejected voxels in a single pass
+    qual_vol[np.logical_not(valid_voxels)] = 0.0
 
+    return qual_vol, rot_vol, width_vol
 
-def select(qual_vol, rot_vol, width_vol, threshold=0.90, max_filter_size=4):
-    # threshold on grasp quality
-    qual_vol[qual_vol < threshold] = 0.0
 
-    # non maximum suppression
-    max_vol = ndimage.maximum_filter(qual_vol, size=max_filter_size)
-    qual_vol = np.where(qual_vol == max_vol, qual_vol, 0.0)
-    mask = np.where(qual_vol, 1.0, 0.0)
+def select(
+    qual_vol, rot_vol, width_vol, threshold=0.90, max_filter_size=4, device=None
+):
+    # threshold on grasp quality and non maximum suppression in a single mask,
+    # voxels below the threshold can never suppress a voxel above it
+    max_vol = maximum_filter(qual_vol, max_filter_size, device)
+    mask = np.logical_and(qual_vol >= threshold, qual_vol == max_vol)
+    mask &= qual_vol > 0.0  # voxels rejected by process are zero
 
     # construct grasps
-    grasps, scores = [], []
-    for index in np.argwhere(mask):
-        grasp, score = select_index(qual_vol, rot_vol, width_vol, index)
-        grasps.append(grasp)
-        scores.append(score)
-
-    return grasps, scores
-
-
-def select_index(qual_vol, rot_vol, width_vol, index):
-    i, j, k = index
-    score = qual_vol[i, j, k]
-    ori = Rotation.from_quat(rot_vol[:, i, j, k])
-    pos = np.array([i, j, k], dtype=np.float64)
-    width = width_vol[i, j, k]
-    return Grasp(Transform(ori, pos), width), score
+    index = np.argwhere(mask)
+    i, j, k = index.T
+    scores = qual_vol[i, j, k]
+    oris = Rotation.from_quat(rot_vol[i, j, k]) if len(index) > 0 else []
+    positions = index.astype(np.float64)
+    widths = width_vol[i, j, k]
+
+    grasps = [
+        Grasp(Transform(oris[n], positions[n]), widths[n]) for n in range(len(index))
+    ]
+
+    return grasps, list(scores)
+
+
+def maximum_filter(vol, size, device=None):
+    """Equivalent of `ndimage.maximum_filter(vol, size)`.
+
+    On a CUDA device, the filter is computed with a 3D max pooling. On the CPU,
+    SciPy's separable implementation is faster.
+    """
+    if device is None or device.type != "cuda":
+        return ndimage.maximum_filter(vol, size=size)
+
+    # pad such that the window is placed like scipy's, i.e. centered at size // 2
+    lower, upper = size // 2, size - 1 - size // 2
+    vol = torch.from_numpy(vol)[None, None].to(device)
+    vol = F.pad(vol, (lower, upper) * 3, value=-np.inf)
+    max_vol = F.max_pool3d(vol, size, stride=1)
+    return max_vol.cpu().squeeze(1).squeeze(0).numpy()
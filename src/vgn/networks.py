@@ -16,6 +16,10 @@ def get_network(name):
 def load_network(path, device):
     """Construct the neural network and load parameters from the specified file.
 
+    The network is put in evaluation mode and compiled with `torch.compile`, which
+    removes per-call Python overhead during inference. Compilation is triggered here
+    with a dummy forward pass, such that it is not part of the first detection.
+
     Args:
         path: Path to the model parameters. The name must conform to `vgn_name_[_...]`.
 
@@ -23,6 +27,13 @@ def load_network(path, device):
     model_name = path.stem.split("_")[1]
     net = get_network(model_name).to(device)
     net.load_state_dict(torch.load(path, map_location=device))
+    net.eval()
+    net = torch.compile(net)
+    # created outside inference mode like the inputs in `predict_batch`, such that
+    # the compiled graph is reused rather than recompiled on the first detection
+    tsdf_vol = torch.zeros(1, 1, 40, 40, 40, device=device)
+    with torch.inference_mode():
+        net(tsdf_vol)
     return net
 
 
@@ -41,7 +41,8 @@ class ClutterRemovalSim(object):
         self._snapshot_id = self.world.save_state()
 
     def restore_state(self):
-        self.world.restore_state(self._snapshot_id)
+        with self.world.no_rendering():
+            self.world.restore_state(self._snapshot_id)
 
     def reset(self, object_count):
         self.world.reset()
@@ -56,15 +57,16 @@ class ClutterRemovalSim(object):
                 cameraTargetPosition=[0.15, 0.50, -0.3],
             )
 
-        table_height = self.gripper.finger_depth
-        self.place_table(table_height)
+        with self.world.no_rendering():
+            table_height = self.gripper.finger_depth
+            self.place_table(table_height)
 
-        if self.scene == "pile":
-            self.generate_pile_scene(object_count, table_height)
-        elif self.scene == "packed":
-            self.generate_packed_scene(object_count, table_height)
-        else:
-            raise ValueError("Invalid scene argument")
+            if self.scene == "pile":
+                self.generate_pile_scene(object_count, table_height)
+            elif self.scene == "packed":
+                self.generate_packed_scene(object_count, table_height)
+            else:
+                raise ValueError("Invalid scene argument")
 
     def draw_workspace(self):
         points = workspace_lines(self.size)
@@ -224,13 +226,13 @@ class ClutterRemovalSim(object):
                     break
 
     def remove_objects_outside_workspace(self):
-        removed_object = False
-        for body in list(self.world.bodies.values()):
-            xyz = body.get_pose().translation
-            if np.any(xyz < 0.0) or np.any(xyz > self.size):
-                self.world.remove_body(body)
-                removed_object = True
-        return removed_object
+        bodies = list(self.world.bodies.values())
+        xyz = [self.world.p.getBasePositionAndOrientation(b.uid)[0] for b in bodies]
+        xyz = np.reshape(xyz, (-1, 3))
+        outside = np.any(np.logical_or(xyz < 0.0, xyz > self.size), axis=1)
+        for body in [body for body, o in zip(bodies, outside) if o]:
+            self.world.remove_body(body)
+        return bool(np.any(outside))
 
     def check_success(self, gripper):
         # check that the fingers are in contact with some object and not fully closed
@@ -281,12 +283,18 @@ class Gripper(object):
         self.joint1.set_position(0.5 * self.max_opening_width, kinematics=True)
         self.joint2 = self.body.joints["panda_finger_joint2"]
         self.joint2.set_position(0.5 * self.max_opening_width, kinematics=True)
+        self.finger_joint_indices = [self.joint1.joint_index, self.joint2.joint_index]
 
     def update_tcp_constraint(self, T_world_tcp):
         T_world_body = T_world_tcp * self.T_tcp_body
+        self.update_body_constraint(
+            T_world_body.translation, T_world_body.rotation.as_quat()
+        )
+
+    def update_body_constraint(self, position, orientation):
         self.constraint.change(
-            jointChildPivot=T_world_body.translation,
-            jointChildFrameOrientation=T_world_body.rotation.as_quat(),
+            jointChildPivot=position,
+            jointChildFrameOrientation=orientation,
             maxForce=300,
         )
 
@@ -304,9 +312,12 @@ class Gripper(object):
         dist_step = diff / n_steps
         dur_step = np.linalg.norm(dist_step) / vel
 
+        # the orientation stays fixed, so the body frame moves along with the tcp
+        position = T_world_body.translation.copy()
+        orientation = T_world_body.rotation.as_quat()
         for _ in range(n_steps):
-            T_world_tcp.translation += dist_step
-            self.update_tcp_constraint(T_world_tcp)
+            position += dist_step
+            self.update_body_constraint(position, orientation)
             for _ in range(int(dur_step / self.world.dt)):
                 self.world.step()
             if abort_on_contact and self.detect_contact():
@@ -325,5 +336,5 @@ class Gripper(object):
             self.world.step()
 
     def read(self):
-        width = self.joint1.get_position() + self.joint2.get_position()
+        width = sum(self.body.get_joint_positions(self.finger_joint_indices))
         return width
@@ -1,3 +1,4 @@
+import contextlib
 import time
 
 import numpy as np
@@ -27,8 +28,30 @@ class BtWorld(object):
         self.dt = 1.0 / 240.0
         self.solver_iterations = 150
 
+        self.rendering = True
+        if self.gui:
+            self.p.configureDebugVisualizer(pybullet.COV_ENABLE_SHADOWS, 0)
+
         self.reset()
 
+    @contextlib.contextmanager
+    def no_rendering(self):
+        """Disable rendering of the GUI within the block, speeds up loading bodies.
+
+        Restores the previous rendering state on exit, such that blocks can be nested.
+        """
+        previous = self.rendering
+        self.set_rendering(False)
+        try:
+            yield
+        finally:
+            self.set_rendering(previous)
+
+    def set_rendering(self, enabled):
+        self.rendering = enabled
+        if self.gui:
+            self.p.configureDebugVisualizer(pybullet.COV_ENABLE_RENDERING, int(enabled))
+
     def set_gravity(self, gravity):
         self.p.setGravity(*gravity)
 
@@ -134,6 +157,11 @@ class Body(object):
         linear, angular = self.p.getBaseVelocity(self.uid)
         return linear, angular
 
+    def get_joint_positions(self, joint_indices):
+        """Read the positions of several joints with a single query."""
+        joint_states = self.p.getJointStates(self.uid, joint_indices)
+        return [joint_state[0] for joint_state in joint_states]
+
 
 class Link(object):
     """Interface to a link simulated in Pybullet.